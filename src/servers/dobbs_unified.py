@@ -5,18 +5,36 @@ A natural language interface for all mathematical research and file operations
 """
 
 import asyncio
+import functools
+import hashlib
+import inspect
 import json
 import sys
 import os
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Awaitable, Callable, Tuple
 from pathlib import Path
 import uuid
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.utils.common import setup_logging, load_config, ensure_directory
+from src.utils.common import setup_logging, load_config, ensure_directory, forget_directory
+from src.utils.http import get_session, close_session
+
+from cachetools import TTLCache
+
+# Optional fast JSON serializer for tool responses
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional libuv-based event loop for faster network I/O
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 # Import MCP SDK
 from mcp.server.models import InitializationOptions
@@ -77,7 +95,7 @@ try:
 except ImportError as e:
     kimi_available = False
     import logging
-    logging.getLogger("MathResearchMCP").warning(f"Kimi K2 integration unavailable: {e}")
+    logging.getLogger("MathResearchMCP").warning("Kimi K2 integration unavailable: %s", e)
 
 # Setup logging
 logger = setup_logging("MathResearchMCP")
@@ -94,13 +112,43 @@ if kimi_available:
     try:
         kimi_k2 = KimiK2Integration(server)
     except Exception as e:
-        logger.warning(f"Failed to initialize Kimi K2 integration: {e}")
+        logger.warning("Failed to initialize Kimi K2 integration: %s", e)
 
 # Define Kimi K2 tools
 KIMI_K2_TOOLS = kimi_k2.tools if kimi_k2 else []
 
-# Combine all tools
-ALL_TOOLS = [
+# Result returned for Kimi K2 tools when the integration could not be loaded
+KIMI_K2_UNAVAILABLE = {
+    "error": "Kimi K2 integration not available. Please install groq: pip install groq",
+    "status": "error"
+}
+
+# Run several independent tool calls concurrently
+BATCH_TOOL_CALL_TOOL = Tool(
+    name="batch_tool_call",
+    description="Run several independent tool calls concurrently and return all results in one response",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "calls": {
+                "type": "array",
+                "description": "Tool calls to run; each result is returned in the same order",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string", "description": "Name of the tool to call"},
+                        "arguments": {"type": "object", "description": "Arguments for the tool"}
+                    },
+                    "required": ["name"]
+                }
+            }
+        },
+        "required": ["calls"]
+    }
+)
+
+# Combine all tools (immutable; the tool set is fixed for the process lifetime)
+ALL_TOOLS: Tuple[Tool, ...] = (
     # File operations (most commonly used)
     *FILE_OPERATION_TOOLS,
     
@@ -138,182 +186,380 @@ ALL_TOOLS = [
     *GEMINI_OPERATION_TOOLS,
     
     # Kimi K2 operations (if available)
-    *KIMI_K2_TOOLS
-]
+    *KIMI_K2_TOOLS,
+    
+    # Concurrent fan-out over the tools above
+    BATCH_TOOL_CALL_TOOL,
+)
+
+# Response for list_tools, built once instead of on every request
+_LIST_TOOLS_CACHED: List[Tool] = list(ALL_TOOLS)
+
+# Map tool names to their handlers; built once so routing is a single lookup
+TOOL_DISPATCH: Dict[str, Callable[..., Awaitable[Any]]] = {
+    # File operations
+    "search_dropbox": search_dropbox,
+    "list_dropbox_folder": list_dropbox_folder,
+    "read_dropbox_file": read_dropbox_file,
+    "save_to_dropbox": save_to_dropbox,
+    "copy_file": copy_file,
+    "move_file": move_file,
+    "delete_file": delete_file,
+    "create_folder": create_folder,
+    
+    # GitHub operations
+    "list_github_repos": list_github_repos,
+    "browse_github_repo": browse_github_repo,
+    "read_github_file": read_github_file,
+    "create_github_file": create_github_file,
+    "get_github_repo_info": get_github_repo_info,
+    "list_github_commits": list_github_commits,
+    "search_github": search_github,
+    
+    # Research coordination
+    "initiate_research_session": initiate_research_session,
+    "coordinate_workflow": coordinate_workflow,
+    "get_session_status": get_session_status,
+    "manage_agents": manage_agents,
+    
+    # Research discovery
+    "discover_research": discover_research,
+    "analyze_paper": analyze_paper,
+    "find_related_work": find_related_work,
+    "track_research_trends": track_research_trends,
+    
+    # Visualization
+    "create_manim_animation": create_manim_animation,
+    "validate_with_wolfram": validate_with_wolfram,
+    "create_static_diagram": create_static_diagram,
+    "create_interactive_visual": create_interactive_visual,
+    
+    # Knowledge management
+    "ingest_to_obsidian": ingest_to_obsidian,
+    "sync_to_dropbox": sync_to_dropbox,
+    "manage_github_repo": manage_github_repo,
+    "create_smart_index": create_smart_index,
+    
+    # Notion operations
+    "search_notion": search_notion,
+    "create_notion_page": create_notion_page,
+    "update_notion_page": update_notion_page,
+    "add_to_notion_database": add_to_notion_database,
+    "list_notion_databases": list_notion_databases,
+    "sync_obsidian_to_notion": sync_obsidian_to_notion,
+    
+    # Gemini operations
+    "gemini_query": gemini_query,
+    "gemini_analyze_code": gemini_analyze_code,
+    "gemini_brainstorm": gemini_brainstorm,
+    "gemini_summarize": gemini_summarize,
+    "gemini_math_analysis": gemini_math_analysis,
+    "gemini_research_review": gemini_research_review,
+}
+
+# Keep synchronous handlers off the event loop
+for _name, _handler in TOOL_DISPATCH.items():
+    if not inspect.iscoroutinefunction(_handler):
+        TOOL_DISPATCH[_name] = functools.partial(asyncio.to_thread, _handler)
+
+# Serializer for tool responses; non-JSON values such as paths fall back to str()
+_stdlib_dumps = functools.partial(json.dumps, indent=2, ensure_ascii=False, default=str)
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    
+    def _dumps(obj: Any) -> str:
+        """Serialize a tool result to indented JSON text"""
+        try:
+            return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS).decode()
+        except TypeError:
+            # orjson.JSONEncodeError, e.g. integers wider than 64 bits from sympy
+            # or Wolfram results; the stdlib serializer handles these
+            return _stdlib_dumps(obj)
+else:
+    _dumps = _stdlib_dumps
+
+# Read-only tools whose responses can be reused for identical arguments
+CACHEABLE_TOOLS = frozenset({
+    "list_github_repos",
+    "get_github_repo_info",
+    "list_github_commits",
+    "search_github",
+    "list_notion_databases",
+    "search_notion",
+    "validate_with_wolfram",
+})
+
+# Tool results keyed by (tool name, argument digest)
+_response_cache: TTLCache = TTLCache(
+    maxsize=config['settings']['tool_cache_size'],
+    ttl=config['settings']['tool_cache_ttl']
+)
+
+# Marks a cache miss, since None is a valid tool result
+_MISSING = object()
+
+# Shared task per in-flight key so concurrent identical calls share one upstream
+# request and all receive its outcome, whether a result or an exception
+_inflight_calls: Dict[Tuple[str, bytes], asyncio.Task] = {}
+
+def _cache_key(name: str, arguments: dict) -> Tuple[str, bytes]:
+    """Build a cache key from the tool name and its canonicalized arguments"""
+    canonical = json.dumps(arguments, sort_keys=True, default=str).encode()
+    return (name, hashlib.blake2b(canonical, digest_size=16).digest())
+
+def _is_error_result(result: Any) -> bool:
+    """Check whether a tool result reports an error"""
+    return isinstance(result, dict) and ("error" in result or result.get("status") == "error")
+
+async def _fill_cache(key: Tuple[str, bytes], handler: Callable[..., Awaitable[Any]], arguments: dict) -> Any:
+    """Run a cacheable tool once and store its result unless it reports an error"""
+    result = await handler(**arguments)
+    if not _is_error_result(result):
+        _response_cache[key] = result
+    return result
+
+async def _cached_call(name: str, handler: Callable[..., Awaitable[Any]], arguments: dict) -> Any:
+    """Run a cacheable tool, reusing a recent result for the same arguments"""
+    key = _cache_key(name, arguments)
+    result = _response_cache.get(key, _MISSING)
+    if result is not _MISSING:
+        return result
+    
+    task = _inflight_calls.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fill_cache(key, handler, arguments))
+        _inflight_calls[key] = task
+        
+        def forget(done: asyncio.Task) -> None:
+            if _inflight_calls.get(key) is done:
+                del _inflight_calls[key]
+        task.add_done_callback(forget)
+    
+    # Shield the shared task so one caller giving up does not cancel it for the rest
+    return await asyncio.shield(task)
+
+# Tools that can remove directories remembered by ensure_directory
+DIRECTORY_CHANGING_TOOLS = frozenset({
+    "delete_file",
+    "move_file",
+})
+
+def _make_runner(name: str, handler: Callable[..., Awaitable[Any]]) -> Callable[[dict], Awaitable[Any]]:
+    """Build the coroutine that runs one tool and returns its unserialized result"""
+    if name in CACHEABLE_TOOLS:
+        return functools.partial(_cached_call, name, handler)
+    
+    if name in DIRECTORY_CHANGING_TOOLS:
+        async def run(arguments: dict) -> Any:
+            try:
+                return await handler(**arguments)
+            finally:
+                # Forget all remembered directories, even after a partial failure;
+                # re-checking them is cheap
+                forget_directory()
+        return run
+    
+    async def run(arguments: dict) -> Any:
+        return await handler(**arguments)
+    return run
+
+async def _run_tool(name: str, arguments: dict) -> Any:
+    """Run a tool from TOOL_DISPATCH and return its unserialized result"""
+    runner = _TOOL_RUNNERS.get(name)
+    if runner is None:
+        return {"error": f"Unknown tool: {name}"}
+    return await runner(arguments)
+
+class _InvalidCall(ValueError):
+    """A batched call rejected because of malformed input, not a tool failure"""
+
+def _call_name(call: Any) -> Optional[str]:
+    """Tool name of a batched call, or None if the call is malformed"""
+    return call.get("name") if isinstance(call, dict) else None
+
+def _parse_text(text: str) -> Any:
+    """Decode a JSON text response so batched results share one shape"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+async def batch_tool_call(calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Run independent tool calls concurrently
+    
+    At most settings.max_concurrent_tools calls run at once. A failing call
+    does not affect the others; its error is reported in its own entry.
+    
+    Args:
+        calls: List of {"name": ..., "arguments": {...}} tool calls
+        
+    Returns:
+        Results in the same order as the calls
+    """
+    if not isinstance(calls, list):
+        return {
+            "status": "error",
+            "error": "'calls' must be a list of {\"name\": ..., \"arguments\": {...}} objects"
+        }
+    
+    semaphore = asyncio.Semaphore(config['settings']['max_concurrent_tools'])
+    
+    async def run(call: Dict[str, Any]) -> Any:
+        name = _call_name(call)
+        if not isinstance(name, str) or not name:
+            raise _InvalidCall("Each call needs a 'name' string naming the tool to run")
+        arguments = call.get("arguments") or {}
+        if not isinstance(arguments, dict):
+            raise _InvalidCall("'arguments' must be an object")
+        if name == "batch_tool_call":
+            raise _InvalidCall("batch_tool_call cannot be nested")
+        async with semaphore:
+            if name.startswith("kimi_k2_"):
+                if not kimi_k2:
+                    return KIMI_K2_UNAVAILABLE
+                contents = await kimi_k2.handle_tool_call(name, arguments)
+                return [_parse_text(content.text) for content in contents]
+            return await _run_tool(name, arguments)
+    
+    results = await asyncio.gather(*(run(call) for call in calls), return_exceptions=True)
+    
+    for call, result in zip(calls, results):
+        if isinstance(result, _InvalidCall):
+            logger.warning("Rejected batched call %s: %s", _call_name(call), result)
+        elif isinstance(result, Exception):
+            logger.error("Error handling batched tool %s: %s", _call_name(call), result, exc_info=result)
+    
+    return {
+        "status": "success",
+        "results": [
+            {"tool": _call_name(call), "error": str(result)}
+            if isinstance(result, Exception)
+            else {"tool": _call_name(call), "result": result}
+            for call, result in zip(calls, results)
+        ]
+    }
+
+TOOL_DISPATCH["batch_tool_call"] = batch_tool_call
+
+def _error_text(name: str, e: Exception) -> str:
+    """Serialize the error payload for a failed tool call"""
+    return _dumps({
+        "error": str(e),
+        "tool": name,
+        "suggestion": "Check the parameters and try again"
+    })
+
+def _error_response(name: str, e: Exception) -> List[TextContent]:
+    """Log a tool failure and build the error response returned to the client"""
+    logger.error("Error handling tool %s: %s", name, e, exc_info=True)
+    return [TextContent(type="text", text=_error_text(name, e))]
+
+# Result-returning coroutine per tool, shared by single and batched calls
+_TOOL_RUNNERS: Dict[str, Callable[[dict], Awaitable[Any]]] = {
+    name: _make_runner(name, handler) for name, handler in TOOL_DISPATCH.items()
+}
+
+def _bind_handler(name: str, runner: Callable[[dict], Awaitable[Any]]) -> Callable[[dict], Awaitable[List[TextContent]]]:
+    """Build the MCP-facing coroutine that serializes a tool runner's result"""
+    async def call(arguments: dict) -> List[TextContent]:
+        try:
+            return [TextContent(type="text", text=_dumps(await runner(arguments)))]
+        except Exception as e:
+            return _error_response(name, e)
+    return call
+
+async def _call_kimi_k2(name: str, arguments: dict) -> List[TextContent]:
+    """Forward a Kimi K2 tool call to the integration, mapping errors"""
+    try:
+        return await kimi_k2.handle_tool_call(name, arguments)
+    except Exception as e:
+        return _error_response(name, e)
+
+# MCP-facing coroutine per tool name. The SDK's call_tool() takes a single
+# handler for every tool, so the per-tool wrappers are built once here and
+# handle_call_tool only has to look one up.
+_BOUND_TOOLS: Dict[str, Callable[[dict], Awaitable[List[TextContent]]]] = {
+    **{name: _bind_handler(name, runner) for name, runner in _TOOL_RUNNERS.items()},
+    **{tool.name: functools.partial(_call_kimi_k2, tool.name) for tool in KIMI_K2_TOOLS},
+}
 
 # List available tools
 @server.list_tools()
 async def handle_list_tools() -> List[Tool]:
     """Return all available tools"""
-    return ALL_TOOLS
+    return _LIST_TOOLS_CACHED
 
 # Tool handler
 @server.call_tool()
 async def handle_call_tool(name: str, arguments: dict) -> List[TextContent]:
     """Handle all tool calls"""
-    try:
-        # File operations
-        if name == "search_dropbox":
-            result = await search_dropbox(**arguments)
-        elif name == "list_dropbox_folder":
-            result = await list_dropbox_folder(**arguments)
-        elif name == "read_dropbox_file":
-            result = await read_dropbox_file(**arguments)
-        elif name == "save_to_dropbox":
-            result = await save_to_dropbox(**arguments)
-        elif name == "copy_file":
-            result = await copy_file(**arguments)
-        elif name == "move_file":
-            result = await move_file(**arguments)
-        elif name == "delete_file":
-            result = await delete_file(**arguments)
-        elif name == "create_folder":
-            result = await create_folder(**arguments)
-        
-        # GitHub operations
-        elif name == "list_github_repos":
-            result = await list_github_repos(**arguments)
-        elif name == "browse_github_repo":
-            result = await browse_github_repo(**arguments)
-        elif name == "read_github_file":
-            result = await read_github_file(**arguments)
-        elif name == "create_github_file":
-            result = await create_github_file(**arguments)
-        elif name == "get_github_repo_info":
-            result = await get_github_repo_info(**arguments)
-        elif name == "list_github_commits":
-            result = await list_github_commits(**arguments)
-        elif name == "search_github":
-            result = await search_github(**arguments)
-        
-        # Research coordination
-        elif name == "initiate_research_session":
-            result = await initiate_research_session(**arguments)
-        elif name == "coordinate_workflow":
-            result = await coordinate_workflow(**arguments)
-        elif name == "get_session_status":
-            result = await get_session_status(**arguments)
-        elif name == "manage_agents":
-            result = await manage_agents(**arguments)
-        
-        # Research discovery
-        elif name == "discover_research":
-            result = await discover_research(**arguments)
-        elif name == "analyze_paper":
-            result = await analyze_paper(**arguments)
-        elif name == "find_related_work":
-            result = await find_related_work(**arguments)
-        elif name == "track_research_trends":
-            result = await track_research_trends(**arguments)
-        
-        # Visualization
-        elif name == "create_manim_animation":
-            result = await create_manim_animation(**arguments)
-        elif name == "validate_with_wolfram":
-            result = await validate_with_wolfram(**arguments)
-        elif name == "create_static_diagram":
-            result = await create_static_diagram(**arguments)
-        elif name == "create_interactive_visual":
-            result = await create_interactive_visual(**arguments)
-        
-        # Knowledge management
-        elif name == "ingest_to_obsidian":
-            result = await ingest_to_obsidian(**arguments)
-        elif name == "sync_to_dropbox":
-            result = await sync_to_dropbox(**arguments)
-        elif name == "manage_github_repo":
-            result = await manage_github_repo(**arguments)
-        elif name == "create_smart_index":
-            result = await create_smart_index(**arguments)
-        
-        # Notion operations
-        elif name == "search_notion":
-            result = await search_notion(**arguments)
-        elif name == "create_notion_page":
-            result = await create_notion_page(**arguments)
-        elif name == "update_notion_page":
-            result = await update_notion_page(**arguments)
-        elif name == "add_to_notion_database":
-            result = await add_to_notion_database(**arguments)
-        elif name == "list_notion_databases":
-            result = await list_notion_databases(**arguments)
-        elif name == "sync_obsidian_to_notion":
-            result = await sync_obsidian_to_notion(**arguments)
-        
-        # Gemini operations
-        elif name == "gemini_query":
-            result = await gemini_query(**arguments)
-        elif name == "gemini_analyze_code":
-            result = await gemini_analyze_code(**arguments)
-        elif name == "gemini_brainstorm":
-            result = await gemini_brainstorm(**arguments)
-        elif name == "gemini_summarize":
-            result = await gemini_summarize(**arguments)
-        elif name == "gemini_math_analysis":
-            result = await gemini_math_analysis(**arguments)
-        elif name == "gemini_research_review":
-            result = await gemini_research_review(**arguments)
-        
-        # Kimi K2 operations
-        elif name.startswith("kimi_k2_"):
-            if kimi_k2:
-                return await kimi_k2.handle_tool_call(name, arguments)
-            else:
-                result = {
-                    "error": "Kimi K2 integration not available. Please install groq: pip install groq",
-                    "status": "error"
-                }
-        
-        else:
-            result = {"error": f"Unknown tool: {name}"}
-        
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+    bound = _BOUND_TOOLS.get(name)
+    if bound is not None:
+        return await bound(arguments)
     
-    except Exception as e:
-        logger.error(f"Error handling tool {name}: {e}")
-        return [TextContent(type="text", text=json.dumps({
-            "error": str(e),
-            "tool": name,
-            "suggestion": "Check the parameters and try again"
-        }, indent=2))]
+    # Kimi K2 may handle names it does not list as tools
+    if name.startswith("kimi_k2_"):
+        if kimi_k2:
+            return await _call_kimi_k2(name, arguments)
+        result = KIMI_K2_UNAVAILABLE
+    else:
+        result = {"error": f"Unknown tool: {name}"}
+    return [TextContent(type="text", text=_dumps(result))]
 
-async def main():
-    """Main entry point for the MCP server"""
-    logger.info("Starting Mathematical Research MCP Server...")
-    logger.info(f"Dropbox base path: {config['paths']['dropbox_base']}")
-    logger.info(f"Obsidian vault: {config['paths']['obsidian_vault']}")
-    logger.info(f"Total tools available: {len(ALL_TOOLS)}")
-    
-    # Add startup delay to prevent timeout
-    logger.info("Initializing server components...")
-    await asyncio.sleep(0.5)
-    
-    # Ensure required directories exist
-    ensure_directory(config['paths']['obsidian_vault'])
-    ensure_directory(config['paths']['manim_output'])
-    
-    # Initialize Kimi K2 if available
+async def _ensure_directories() -> None:
+    """Ensure all configured directories exist, creating them in parallel worker threads"""
+    await asyncio.gather(*(
+        asyncio.to_thread(ensure_directory, path) for path in config['paths'].values()
+    ))
+
+def _init_kimi_k2() -> None:
+    """Register the Kimi K2 integration with the server, if available"""
     if kimi_k2:
         logger.info("Initializing Kimi K2 integration...")
         kimi_k2.register_with_server()
         logger.info("✅ Kimi K2 integration active (4 tools)")
     else:
         logger.warning("⚠️  Kimi K2 integration not available")
+
+async def main():
+    """Main entry point for the MCP server"""
+    logger.info("Starting Mathematical Research MCP Server...")
+    logger.info("Dropbox base path: %s", config['paths']['dropbox_base'])
+    logger.info("Obsidian vault: %s", config['paths']['obsidian_vault'])
+    logger.info("Total tools available: %d", len(ALL_TOOLS))
     
-    # Run the server
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="mathematical-research-mcp",
-                server_version="1.0.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
-                ),
-            ),
+    # Register Kimi K2 handlers on the loop thread; this only mutates server state
+    _init_kimi_k2()
+    
+    try:
+        # Run the remaining initialization steps together; serving starts as soon as both finish
+        logger.info("Initializing server components...")
+        await asyncio.gather(
+            _ensure_directories(),
+            get_session(),  # Warm the shared HTTP session so the first tool call skips setup
         )
+        
+        # Run the server
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="mathematical-research-mcp",
+                    server_version="1.0.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
+                ),
+            )
+    finally:
+        await close_session()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
@@ -4,12 +4,39 @@ Provides configuration loading, logging setup, and directory management
 """
 
 import os
+import functools
 import logging
 import json
+import re
 from pathlib import Path
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Iterable, List, Mapping, Optional, Set, Union
 from dotenv import load_dotenv
 
+# Characters that are not allowed in filenames, and runs of underscores
+_UNSAFE_CHARS = re.compile(r'[<>:"/\\|?*]')
+_MULTI_US = re.compile(r'_+')
+_UNSAFE_TRANSLATION = str.maketrans({c: '_' for c in '<>:"/\\|?*'})
+
+# API keys checked by validate_api_keys (a tuple keeps the report order stable)
+_REQUIRED_API_KEYS = (
+    "perplexity", "wolfram", "dropbox_app_key",
+    "dropbox_app_secret", "github", "notion", "gemini"
+)
+
+# Directories already ensured by ensure_directory in this process
+_ENSURED_DIRS: Set[str] = set()
+
+# Whether the .env file has already been loaded for this process
+_ENV_LOADED = False
+
+def _ensure_env() -> None:
+    """Load environment variables from the .env file once per process"""
+    global _ENV_LOADED
+    if not _ENV_LOADED:
+        load_dotenv()
+        _ENV_LOADED = True
+
 def setup_logging(name: str = "MathResearchMCP", level: str = "INFO") -> logging.Logger:
     """
     Set up logging for the application
@@ -22,7 +49,7 @@ def setup_logging(name: str = "MathResearchMCP", level: str = "INFO") -> logging
         Configured logger instance
     """
     # Load environment variables
-    load_dotenv()
+    _ensure_env()
     
     # Get log level from environment or use default
     log_level = os.getenv("LOG_LEVEL", level)
@@ -48,20 +75,25 @@ def setup_logging(name: str = "MathResearchMCP", level: str = "INFO") -> logging
     
     return logger
 
-def load_config() -> Dict[str, Any]:
+@functools.lru_cache(maxsize=1)
+def load_config() -> Mapping[str, Any]:
     """
     Load configuration from environment variables
     
+    The result is cached for the lifetime of the process and returned as a
+    read-only mapping (including each section), so every caller shares the
+    same configuration.
+    
     Returns:
-        Configuration dictionary with all required settings
+        Configuration mapping with all required settings
     """
     # Load environment variables from .env file
-    load_dotenv()
+    _ensure_env()
     
     # Get base paths with defaults
-    dropbox_base = os.getenv("DROPBOX_BASE_PATH", os.path.expanduser("~/Dropbox"))
-    obsidian_vault = os.getenv("OBSIDIAN_VAULT_PATH", os.path.join(dropbox_base, "Obsidian_Vault"))
-    manim_output = os.getenv("MANIM_OUTPUT_DIR", os.path.join(dropbox_base, "Manim_Outputs"))
+    dropbox_base = Path(os.getenv("DROPBOX_BASE_PATH", "~/Dropbox")).expanduser()
+    obsidian_vault = Path(os.getenv("OBSIDIAN_VAULT_PATH") or dropbox_base / "Obsidian_Vault")
+    manim_output = Path(os.getenv("MANIM_OUTPUT_DIR") or dropbox_base / "Manim_Outputs")
     
     config = {
         # API Keys
@@ -77,14 +109,14 @@ def load_config() -> Dict[str, Any]:
             "groq": os.getenv("GROQ_API_KEY")  # For Kimi K2
         },
         
-        # File paths
+        # File paths (as Path objects)
         "paths": {
             "dropbox_base": dropbox_base,
             "obsidian_vault": obsidian_vault,
             "manim_output": manim_output,
-            "system_files": os.path.join(dropbox_base, "System_Files"),
-            "inbox": os.path.join(dropbox_base, "Inbox"),
-            "knowledge": os.path.join(dropbox_base, "Knowledge")
+            "system_files": dropbox_base / "System_Files",
+            "inbox": dropbox_base / "Inbox",
+            "knowledge": dropbox_base / "Knowledge"
         },
         
         # Dashboard configuration
@@ -99,31 +131,76 @@ def load_config() -> Dict[str, Any]:
             "manim_quality": os.getenv("MANIM_QUALITY", "medium_quality"),
             "log_level": os.getenv("LOG_LEVEL", "INFO"),
             "max_file_size": int(os.getenv("MAX_FILE_SIZE", "10485760")),  # 10MB default
-            "request_timeout": int(os.getenv("REQUEST_TIMEOUT", "30"))  # 30 seconds
+            "request_timeout": int(os.getenv("REQUEST_TIMEOUT", "30")),  # 30 seconds
+            
+            # Shared HTTP connection pool (see src/utils/http.py)
+            "http_max_connections": int(os.getenv("MCP_HTTP_MAX_CONN", "500")),
+            "http_max_per_host": int(os.getenv("MCP_HTTP_MAX_PER_HOST", "100")),
+            "http_keepalive_expiry": float(os.getenv("MCP_HTTP_KEEPALIVE_EXPIRY", "30")),  # seconds
+            
+            # Response cache for read-only tools
+            "tool_cache_size": int(os.getenv("MCP_TOOL_CACHE_SIZE", "1024")),
+            "tool_cache_ttl": float(os.getenv("MCP_TOOL_CACHE_TTL", "300")),  # seconds
+            
+            # Concurrency limit for batch_tool_call
+            "max_concurrent_tools": int(os.getenv("MCP_MAX_CONCURRENT_TOOLS", "8"))
         }
     }
     
-    return config
+    # Freeze every section too, since all callers share the cached object
+    return MappingProxyType({
+        section: MappingProxyType(values) for section, values in config.items()
+    })
 
-def ensure_directory(path: str) -> bool:
+def ensure_directory(path: Union[str, os.PathLike]) -> bool:
     """
     Ensure a directory exists, create it if it doesn't
     
+    Directories created or found by an earlier call are remembered, so
+    repeat calls for the same path skip the filesystem.
+    
     Args:
-        path: Directory path to ensure exists
+        path: Directory path to ensure exists, as a string or Path
         
     Returns:
         True if directory exists or was created successfully
     """
     try:
-        Path(path).mkdir(parents=True, exist_ok=True)
+        key = os.fspath(path)
+        if key in _ENSURED_DIRS:
+            return True
+        os.makedirs(key, exist_ok=True)
+        _ENSURED_DIRS.add(key)
         return True
     except Exception as e:
         logger = logging.getLogger("MathResearchMCP")
-        logger.error(f"Failed to create directory {path}: {e}")
+        logger.error("Failed to create directory %s: %s", path, e)
         return False
 
-def validate_api_keys(config: Dict[str, Any]) -> Dict[str, bool]:
+def forget_directory(path: Optional[Union[str, os.PathLike]] = None) -> None:
+    """
+    Drop directories remembered by ensure_directory so they are checked again
+    
+    Call this after deleting or moving files or folders, since a remembered
+    directory may no longer exist.
+    
+    Args:
+        path: Directory to forget, along with its subdirectories; forget all if omitted
+    """
+    if path is None:
+        _ENSURED_DIRS.clear()
+        return
+    
+    key = os.fspath(path).rstrip(os.sep)
+    prefix = key + os.sep
+    for ensured in [p for p in _ENSURED_DIRS if p == key or p.startswith(prefix)]:
+        _ENSURED_DIRS.discard(ensured)
+
+def _is_real_key(value: Optional[str]) -> bool:
+    """Check that an API key is set and is not a placeholder from .env.example"""
+    return bool(value) and not value.startswith("your_") and value.strip() != ""
+
+def validate_api_keys(config: Mapping[str, Any]) -> Dict[str, bool]:
     """
     Validate that required API keys are present
     
@@ -133,19 +210,8 @@ def validate_api_keys(config: Dict[str, Any]) -> Dict[str, bool]:
     Returns:
         Dictionary with validation status for each API key
     """
-    required_keys = [
-        "perplexity", "wolfram", "dropbox_app_key", 
-        "dropbox_app_secret", "github", "notion", "gemini"
-    ]
-    
-    validation = {}
     api_keys = config.get("api_keys", {})
-    
-    for key in required_keys:
-        value = api_keys.get(key)
-        validation[key] = bool(value and value.strip() and not value.startswith("your_"))
-    
-    return validation
+    return {key: _is_real_key(api_keys.get(key)) for key in _REQUIRED_API_KEYS}
 
 def get_safe_filename(filename: str) -> str:
     """
@@ -157,22 +223,26 @@ def get_safe_filename(filename: str) -> str:
     Returns:
         Safe filename string
     """
-    import re
-    
-    # Replace invalid characters with underscores
-    safe_name = re.sub(r'[<>:"/\\|?*]', '_', filename)
-    
-    # Remove multiple consecutive underscores
-    safe_name = re.sub(r'_+', '_', safe_name)
-    
-    # Remove leading/trailing underscores and spaces
-    safe_name = safe_name.strip('_ ')
+    # Replace invalid characters, collapse underscores, trim and fall back to "untitled"
+    return _MULTI_US.sub('_', _UNSAFE_CHARS.sub('_', filename)).strip('_ ') or "untitled"
+
+def get_safe_filenames(filenames: Iterable[str]) -> List[str]:
+    """
+    Convert many strings to safe filenames, as get_safe_filename does
     
-    # Ensure it's not empty
-    if not safe_name:
-        safe_name = "untitled"
+    Uses a single str.translate pass per name, which is faster than
+    regex substitution for large batches.
     
-    return safe_name
+    Args:
+        filenames: Original filenames
+        
+    Returns:
+        List of safe filename strings, in input order
+    """
+    return [
+        _MULTI_US.sub('_', name.translate(_UNSAFE_TRANSLATION)).strip('_ ') or "untitled"
+        for name in filenames
+    ]
 
 def format_error_response(error: Exception, context: str = "") -> Dict[str, Any]:
     """
@@ -231,7 +301,7 @@ def check_environment_setup() -> Dict[str, Any]:
     
     for name, path in directories.items():
         directory_status[name] = {
-            "path": path,
+            "path": str(path),
             "exists": os.path.exists(path),
             "writable": os.access(path, os.W_OK) if os.path.exists(path) else False
         }
@@ -246,9 +316,9 @@ def check_environment_setup() -> Dict[str, Any]:
 # Create a default logger for this module
 logger = setup_logging(__name__)
 
-# Log configuration loading
+# Log configuration loading (cached, so later load_config() calls are free)
 try:
     config = load_config()
     logger.info("Configuration loaded successfully")
 except Exception as e:
-    logger.error(f"Failed to load configuration: {e}")
+    logger.error("Failed to load configuration: %s", e)
@@ -0,0 +1,50 @@
+"""
+Shared HTTP client for Mathematical Research MCP
+Provides a single long-lived aiohttp session so tool calls reuse pooled connections
+"""
+
+from typing import Optional
+
+import aiohttp
+
+from src.utils.common import load_config
+
+# Process-wide session, created on first use
+_session: Optional[aiohttp.ClientSession] = None
+
+async def get_session() -> aiohttp.ClientSession:
+    """
+    Get the shared HTTP session, creating it if needed
+
+    The session keeps connections alive and caches DNS lookups, so repeated
+    calls to the same host skip the TCP and TLS handshakes. Pool limits come
+    from the MCP_HTTP_MAX_CONN, MCP_HTTP_MAX_PER_HOST and
+    MCP_HTTP_KEEPALIVE_EXPIRY settings; size them for the number of tool
+    calls the client runs in parallel, or bursts will queue for connections.
+
+    Returns:
+        Shared aiohttp client session
+    """
+    global _session
+
+    if _session is None or _session.closed:
+        settings = load_config()["settings"]
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=settings["http_max_connections"],
+                limit_per_host=settings["http_max_per_host"],
+                keepalive_timeout=settings["http_keepalive_expiry"],
+                ttl_dns_cache=300
+            ),
+            timeout=aiohttp.ClientTimeout(total=settings["request_timeout"])
+        )
+
+    return _session
+
+async def close_session() -> None:
+    """Close the shared HTTP session if it is open"""
+    global _session
+
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None